@@ -1,7 +1,5 @@
 import click
 
-from botango.utils.file_creator import FileCreator
-
 
 @click.group()
 def cli():
@@ -10,5 +8,7 @@ def cli():
 @cli.command()
 def init():
     """Запуск построения схемы приложения"""
+    from botango.utils.file_creator import FileCreator
+
     creator = FileCreator()
     creator.create()
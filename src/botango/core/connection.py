@@ -1,5 +1,6 @@
 import asyncio
 import hmac
+import json
 import logging
 import shutil
 import signal
@@ -17,6 +18,11 @@ from aiohttp.web_response import Response
 
 logger = logging.getLogger(__name__)
 
+# тела ответов вебхука не меняются — сериализуем один раз
+_OK_BODY = b'{"ok":true}'
+_INVALID_JSON_BODY = b'{"ok":false,"error":"invalid json"}'
+_DEFAULT_ALLOWED_UPDATES = ("message", "callback_query")
+
 class _BaseConnect:
     def __init__(
             self,
@@ -51,11 +57,12 @@ class LongPolling(_BaseConnect):
         self.dispatcher.include_routers(*routers)
 
     def add_middleware(self, middleware: BaseMiddleware, *events: str):
-        if events:
-            for e in events:
-                type_event = getattr(self.dispatcher, e)
-                if type_event:
-                    type_event.middleware(middleware)
+        # observers — словарь событий роутера aiogram: O(1) поиск и проверка имени
+        observers = self.dispatcher.observers
+        for e in events:
+            if e not in observers:
+                raise ValueError(f"Unknown event {e!r}. Available events: {', '.join(observers)}")
+            observers[e].middleware(middleware)
 
     async def _run(self, drop_pending_updates: bool = True):
         if drop_pending_updates:
@@ -82,6 +89,8 @@ class WebhookBot(_BaseConnect):
         self.app = web.Application(client_max_size=1024*1024)
 
         self._webhook_secret = webhook_secret
+        # кодируем один раз — compare_digest на bytes без конвертаций на каждый апдейт
+        self._webhook_secret_b = webhook_secret.encode("utf-8")
         self._webhook_path = webhook_path if webhook_path.startswith("/") else f"/{webhook_path}"
         self._base_url = base_url  # может быть None — тогда возьмём из ngrok
         self._webhook_url = None  # вычислим на старте
@@ -95,34 +104,36 @@ class WebhookBot(_BaseConnect):
 
     async def _handle(self, request: web.Request) -> Response:
         header_secret = request.headers.get("X-Telegram-Bot-Api-Secret-Token")
-        if not header_secret or not hmac.compare_digest(header_secret, self._webhook_secret):
+        if not header_secret or not hmac.compare_digest(
+            # aiohttp декодирует заголовки с surrogateescape — без него мусорные байты дадут 500 вместо 403
+            header_secret.encode("utf-8", "surrogateescape"), self._webhook_secret_b
+        ):
             return web.Response(status=403)
         try:
-            data = await request.json()
+            data = json.loads(await request.read())
         except Exception as e:
             event.exception("Invalid JSON on webhook: %s", e)
-            return web.json_response({"ok": False, "error": "invalid json"}, status=200)
+            return web.Response(body=_INVALID_JSON_BODY, status=200, content_type="application/json")
 
         try:
             update = Update.model_validate(data, context={"bot": self._bot})
             await self._dispatcher.feed_update(self._bot, update)
         except Exception:
             event.exception("Update handling failed")
-            return web.json_response({"ok": True})
-        return web.json_response({"ok": True})
+        return web.Response(body=_OK_BODY, content_type="application/json")
 
     async def _on_startup(self, app: web.Application):
         self.app["http_session"] = ClientSession(timeout=ClientTimeout(total=10))
         base = await self._resolve_public_base_url()
         self._webhook_url = f"{base}{self._webhook_path}"
 
-        if self._allowed_updates is None or not isinstance(self._allowed_updates, list):
-            self._allowed_updates = ["message", "callback_query"]
+        # [] — осмысленное значение для Telegram (все типы по умолчанию), подменяем только None
+        allowed_updates = self._allowed_updates if self._allowed_updates is not None else _DEFAULT_ALLOWED_UPDATES
 
         await self._bot.set_webhook(
             url=self._webhook_url,
             secret_token=self._webhook_secret,
-            allowed_updates=self._allowed_updates,
+            allowed_updates=allowed_updates,
             drop_pending_updates=self._drop_pending_updates,
         )
         # хук жизненного цикла aiogram v3
@@ -183,10 +194,9 @@ class NgrokManager:
         """
         try:
             with open("/etc/os-release", "r", encoding="utf-8") as f:
-                data = f.read()
-            for line in data.splitlines():
-                if line.startswith("VERSION_CODENAME="):
-                    return line.split("=", 1)[1].strip().strip('"').strip("'") or default
+                for line in f:
+                    if line.startswith("VERSION_CODENAME="):
+                        return line.split("=", 1)[1].strip().strip('"').strip("'") or default
         except Exception:
             pass
         return default
@@ -273,21 +283,24 @@ class NgrokManager:
 
     async def wait_for_https_tunnel(self, timeout: float = 30.0) -> str:
         """Ожидает появления https-туннеля в API ngrok и возвращает public_url."""
-        deadline = asyncio.get_event_loop().time() + timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = 0.1
         async with ClientSession() as s:
             while True:
                 try:
                     async with s.get(self.api_url, timeout=3) as resp:
-                        data = await resp.json()
+                        data = await resp.json() if resp.status == 200 else {}
                     for t in data.get("tunnels", []):
                         pub = t.get("public_url", "")
                         if pub.startswith("https://"):
                             return pub.rstrip("/")
                 except Exception:
                     pass
-                if asyncio.get_event_loop().time() > deadline:
+                if loop.time() > deadline:
                     raise TimeoutError("Не дождался https-туннеля от ngrok")
-                await asyncio.sleep(0.5)
+                await asyncio.sleep(delay)
+                delay = min(delay * 1.5, 2.0)
 
     def stop(self):
         """Корректно останавливает ngrok, если запущен нами."""
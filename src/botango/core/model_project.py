@@ -1,7 +1,11 @@
+import re
 import sys
+import tomllib
 from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
 import subprocess
-from typing import List, Optional, Set, Literal
+from typing import Dict, List, Optional, Set, Literal
 from importlib.metadata import distributions
 
 import click
@@ -24,19 +28,40 @@ CRYPTobot = PackageSpec("cryptobot", "aiocryptopay", "0.4.8")
 XROCKET = PackageSpec("xrocket", "xrocket", "0.2.1")
 YOOMONEY = PackageSpec("yoomoney", "aioyoomoney", "0.1.0")
 
+AIO_SQLITE_KEY = AIO_SQLITE.friendly_name.lower()
+PAYMENT_PACKAGES = {p.friendly_name.lower(): p for p in (CRYPTobot, XROCKET, YOOMONEY)}
 
+
+def normalize_name(name: str) -> str:
+    """Нормализует имя дистрибутива по PEP 503: psycopg2_binary / Psycopg2.Binary -> psycopg2-binary."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+@lru_cache(maxsize=1)
 def get_installed_package_names() -> Set[str]:
-    """Возвращает набор имён установленных дистрибутивов (lowercase)."""
-    names = set()
-    for dist in distributions():
-        # metadata может быть Mapping; Name иногда отсутствует — защитимся
-        try:
-            name = dist.metadata.get("Name") or dist.metadata.get("name")
-        except Exception:
-            name = None
-        if name:
-            names.add(name.lower())
-    return names
+    """Возвращает набор имён установленных дистрибутивов (PEP 503)."""
+    return {normalize_name(dist.name) for dist in distributions() if dist.name}
+
+
+# "SQLAlchemy[asyncio] == 2.0.44; python_version>'3.8'" -> ("SQLAlchemy", " == 2.0.44")
+_REQUIREMENT = re.compile(r"\s*([A-Za-z0-9._-]+)\s*(?:\[[^\]]*\])?([^;]*)")
+
+
+def get_declared_requirements(pyproject: Path = Path("pyproject.toml")) -> Dict[str, str]:
+    """
+    Возвращает зависимости, объявленные в pyproject.toml:
+    имя (PEP 503) -> спецификатор версии без пробелов ("==2.0.44", ">=1.0" или "").
+    """
+    try:
+        data = tomllib.loads(pyproject.read_text(encoding="utf-8"))
+    except (OSError, tomllib.TOMLDecodeError):
+        return {}
+    declared = {}
+    for requirement in data.get("project", {}).get("dependencies", []):
+        match = _REQUIREMENT.match(requirement)
+        if match:
+            declared[normalize_name(match.group(1))] = "".join(match.group(2).split())
+    return declared
 
 
 class ModelProject(BaseModel):
@@ -54,31 +79,24 @@ class ModelProject(BaseModel):
         need_packages: List[PackageSpec] = []
         if self.type_database:
             need_packages.append(SQLALCHEMY)
-            if self.type_database.lower() == AIO_SQLITE.friendly_name.lower():
+            if self.type_database.lower() == AIO_SQLITE_KEY:
                 need_packages.append(AIO_SQLITE)
             else:
                 # предполагаем, что все прочие варианты — postgres-подобные
                 need_packages.append(AIO_POSTGRES)
                 need_packages.append(SYNC_POSTGRES)
 
-        payments_lower = {p.lower() for p in self.payments}
-        if CRYPTobot.friendly_name.lower() in payments_lower:
-            need_packages.append(CRYPTobot)
-        if XROCKET.friendly_name.lower() in payments_lower:
-            need_packages.append(XROCKET)
-        if YOOMONEY.friendly_name.lower() in payments_lower:
-            need_packages.append(YOOMONEY)
+        # порядок пакетов фиксированный (как в PAYMENT_PACKAGES), а не порядок выбора пользователя
+        payments_lower = {payment.lower() for payment in self.payments}
+        need_packages.extend(spec for key, spec in PAYMENT_PACKAGES.items() if key in payments_lower)
 
         return need_packages
 
     def _sort_need_packages(self) -> List[PackageSpec]:
-        need_packages = self._add_packages()
-        installed = get_installed_package_names()
-        to_install = []
-        for p in need_packages:
-            if p.package_name.lower() not in installed:
-                to_install.append(p)
-        return to_install
+        needed = {normalize_name(p.package_name): p for p in self._add_packages()}
+        missing = needed.keys() - get_installed_package_names()
+        # сохраняем исходный порядок пакетов, set-разность его не гарантирует
+        return [p for name, p in needed.items() if name in missing]
 
     def install_packages(self, dry_run: bool = True, upgrade: bool = False, installer: Literal['pip', 'uv'] = 'pip') -> None:
         """
@@ -91,19 +109,43 @@ class ModelProject(BaseModel):
             click.secho(message="Все необходимые пакеты уже установлены.", fg="green", bold=True)
             return
 
-        for p in not_installed:
-            spec = f"{p.package_name}=={p.version}"
-            if installer == "uv":
-                cmd = ["uv", "add", spec]
-            else:
-                cmd = [sys.executable, "-m", "pip", "install", spec]
-            if upgrade:
-                cmd.append("--upgrade")
-            if dry_run:
-                click.secho(message=f"[dry-run] would run: {' '.join(cmd)}", fg="cyan", bold=True)
-            else:
-                click.secho(message=f"Installing {spec} ...", fg="green", bold=True)
-                try:
-                    subprocess.run(cmd, check=True)
-                except subprocess.CalledProcessError as exc:
-                    click.secho(message=f"Ошибка при установке {spec}: {exc}", fg="red", bold=True)
+        to_sync: List[PackageSpec] = []
+        if installer == "uv":
+            # Уже объявленные с той же версией пакеты не нужно `uv add`-ить повторно (лишний прогон резолвера),
+            # но они не установлены — окружение надо синхронизировать.
+            declared = get_declared_requirements()
+            to_sync = [p for p in not_installed if declared.get(normalize_name(p.package_name)) == f"=={p.version}"]
+            not_installed = [p for p in not_installed if p not in to_sync]
+
+        if to_sync:
+            click.secho(
+                message=f"Объявлены в pyproject.toml, но не установлены: "
+                        f"{', '.join(p.package_name for p in to_sync)}",
+                fg="yellow",
+                bold=True
+            )
+
+        specs = [f"{p.package_name}=={p.version}" for p in not_installed]
+        if not specs:
+            # `uv add` сам синхронизирует окружение, отдельный `uv sync` нужен только без него.
+            # --inexact: не удалять пакеты, которых нет в uv.lock (в т.ч. сам botango, поставленный через uv pip)
+            cmd = ["uv", "sync", "--inexact"]
+        elif installer == "uv":
+            cmd = ["uv", "add", *specs]
+        else:
+            cmd = [sys.executable, "-m", "pip", "install", *specs]
+        if upgrade and specs:
+            cmd.append("--upgrade")
+        if dry_run:
+            click.secho(message=f"[dry-run] would run: {' '.join(cmd)}", fg="cyan", bold=True)
+            return
+
+        targets = ", ".join(f"{p.package_name}=={p.version}" for p in [*not_installed, *to_sync])
+        click.secho(message=f"Installing {targets} ...", fg="green", bold=True)
+        try:
+            subprocess.run(cmd, check=True)
+        except subprocess.CalledProcessError as exc:
+            click.secho(message=f"Ошибка при установке {targets}: {exc}", fg="red", bold=True)
+        finally:
+            # набор установленных пакетов изменился — сбрасываем кэш
+            get_installed_package_names.cache_clear()
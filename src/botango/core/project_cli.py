@@ -1,10 +1,14 @@
 import asyncio
+import hashlib
+import json
 import sys
-from typing import List, Optional, Union, Dict, Any
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Dict, Any, Literal, Sequence
 
 import click
-from aiogram import Bot
-from aiogram.utils.token import TokenValidationError
 
 from botango.core.model_project import ModelProject
 
@@ -12,47 +16,137 @@ CONNECTIONS = ["long_polling", "webhook", "ngrok"]
 DATABASES = ["aiosqlite", "postgres"]
 PAYMENTS = ["cryptobot", "xrocket", "yoomoney"]
 
+
+@dataclass(frozen=True)
+class PromptField:
+    key: str                                                  # ключ в данных проекта
+    kind: Literal["token", "choice", "multichoice", "bool"]
+    text: str = ""                                            # текст вопроса
+    step: Optional[int] = None
+    items: Sequence[str] = ()                                 # варианты для choice/multichoice
+    default: bool = False                                     # ответ по умолчанию для bool/confirm
+    confirm: Optional[str] = None                             # вопрос-подтверждение перед выбором
+
+
+# Порядок полей = порядок шагов в интерактивной сборке
+PROJECT_SCHEMA = (
+    PromptField(key="BOT_TOKEN", kind="token", step=1),
+    PromptField(key="CONNECTION_TYPE", kind="choice", text="Выберите тип соединения", step=2, items=CONNECTIONS),
+    PromptField(
+        key="TYPE_DATABASE",
+        kind="choice",
+        text="Выберите тип базы данных",
+        step=3,
+        items=DATABASES,
+        default=True,
+        confirm="Добавить базу данных?"
+    ),
+    PromptField(
+        key="PAYMENTS",
+        kind="multichoice",
+        text="Выберите типы платежных систем",
+        step=4,
+        items=PAYMENTS,
+        confirm=f"Добавить платежные системы? Доступные платежные системы: {PAYMENTS}"
+    ),
+    PromptField(key="DOCKER_FILE", kind="bool", text="Добавить DockerFile?", step=5),
+    PromptField(key="DOCKER_COMPOSE", kind="bool", text="Добавить docker-compose.yaml?", step=6),
+    PromptField(key="GITHUB", kind="bool", text="Добавить папку .github для CI/CD?", step=7),
+)
+
+TOKEN_CACHE_PATH = Path.home() / ".cache" / "botango" / "token_cache.json"
+TOKEN_CACHE_TTL = 60 * 60
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+def _read_token_cache() -> Dict[str, Any]:
+    try:
+        cache = json.loads(TOKEN_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    # файл мог быть испорчен вручную — всё, что не словарь, считаем пустым кэшем
+    return cache if isinstance(cache, dict) else {}
+
+
+def _is_fresh(entry: Any, now: float) -> bool:
+    """Запись валидна, только если это словарь с числовым ts в пределах TTL."""
+    if not isinstance(entry, dict):
+        return False
+    ts = entry.get("ts")
+    return isinstance(ts, (int, float)) and now - ts < TOKEN_CACHE_TTL
+
+
+def _get_cached_username(token: str) -> Optional[str]:
+    """Возвращает username из кэша, если токен уже проверялся не позднее TTL."""
+    entry = _read_token_cache().get(_token_key(token))
+    if not _is_fresh(entry, time.time()):
+        return None
+    username = entry.get("username")
+    return username if isinstance(username, str) and username else None
+
+
+def _cache_username(token: str, username: str) -> None:
+    """Сохраняет проверенный токен (только хэш) вместе с username на диск."""
+    now = time.time()
+    cache = {k: v for k, v in _read_token_cache().items() if _is_fresh(v, now)}
+    cache[_token_key(token)] = {"username": username, "ts": now}
+    try:
+        TOKEN_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        TOKEN_CACHE_PATH.write_text(json.dumps(cache), encoding="utf-8")
+    except OSError:
+        # кэш — лишь оптимизация, ошибка записи не должна ломать сборку
+        pass
+
+
+@lru_cache(maxsize=None)
+def _step_header(step: int) -> str:
+    return click.style(text=f"Шаг № {step}", fg="white", bold=True)
+
+
 class ProjectCli:
     def __init__(self):
         self._data = {}
         self._model: Optional[ModelProject] = None
         self._is_build: bool = False
+        self._runner: Optional[asyncio.Runner] = None
+        # подсказки повторяются в циклах ввода — стилизуем один раз
+        self._prompt_one = self.style("Введите номер варианта. По умолчанию", fg="green", bold=True)
+        self._prompt_many = self.style(
+            "Введите номер варианта (можно несколько через пробел). По умолчанию", fg="green", bold=True
+        )
+
+    def _run_async(self, coro):
+        """Выполняет корутину в общем для всей сборки event loop."""
+        if self._runner is None:
+            self._runner = asyncio.Runner()
+        return self._runner.run(coro)
 
     @staticmethod
     def _step(step: int):
-        click.echo(message=click.style(text=f"Шаг № {step}", fg="white", bold=True))
+        click.echo(message=_step_header(step))
 
     @staticmethod
     def style(text: str,  fg: str = None,  bold=False,  italic=False):
         return click.style(text=text, fg=fg, bold=bold, italic=italic)
 
-    def _get_token(self):
-        self._step(1)
-        token: str = click.prompt(
-            text=self.style(text="Введите токен бота", fg="green", bold=True, italic=True),
-            hide_input=True,
-            type=str
-        )
+    def _validate_token(self, token: str) -> str:
+        """Проверяет токен через getMe и возвращает username бота."""
+        # aiogram тяжёлый — импортируем только когда токен действительно нужно проверить
+        from aiogram import Bot
+        from aiogram.utils.token import TokenValidationError
 
         try:
-            bot = Bot(token=token.strip())
+            bot = Bot(token=token)
 
-            async def _validate_token():
+            async def _get_username():
                 async with bot:
                     me = (await bot.get_me()).username
                     return me
 
-            username = asyncio.run(_validate_token())
-
-            self._data["BOT_TOKEN"] = token
-            self._data["BOT_USERNAME"] = username
-            self._data["BOT_URL"] = f"https://t.me/{username}"
-
-            click.echo(
-                message=f"{self.style(text=f"✅ Токен бота валидный!!!\n", fg="green", bold=True)}"
-                        f"{self.style(text="Username: ", fg="blue", bold=True)}"
-                        f"{self.style(text=f"@{self._data.get("BOT_USERNAME")}\n", fg="green", bold=True)}"
-            )
+            return self._run_async(_get_username())
         except TokenValidationError as e:
             click.BadParameter(f"{e.args[0]}")
             click.echo(
@@ -68,16 +162,38 @@ class ProjectCli:
             )
             sys.exit(1)
 
-    def _get_choice(self, text: str, items: List[str], key: str, step: Optional[int] = None, many: bool = False):
-        if step:
-            self._step(step)
-        click.echo(self.style(f"{text}:\n", fg="white", bold=True))
+    def _get_token(self, step: int = 1):
+        self._step(step)
+        token: str = click.prompt(
+            text=self.style(text="Введите токен бота", fg="green", bold=True, italic=True),
+            hide_input=True,
+            type=str
+        )
 
-        # выводим список вариантов
-        for i, conn in enumerate(items, start=1):
-            click.echo(self.style(text=f"{i}. {conn}", fg="cyan", italic=True))
+        username = _get_cached_username(token.strip())
+        if username is None:
+            username = self._validate_token(token.strip())
+            _cache_username(token.strip(), username)
 
-        click.echo("")
+        self._data["BOT_TOKEN"] = token
+        self._data["BOT_USERNAME"] = username
+        self._data["BOT_URL"] = f"https://t.me/{username}"
+
+        click.echo(
+            message=f"{self.style(text=f"✅ Токен бота валидный!!!\n", fg="green", bold=True)}"
+                    f"{self.style(text="Username: ", fg="blue", bold=True)}"
+                    f"{self.style(text=f"@{self._data.get("BOT_USERNAME")}\n", fg="green", bold=True)}"
+        )
+
+    def _get_choice(self, text: str, items: Sequence[str], key: str, step: Optional[int] = None, many: bool = False):
+        if step:
+            self._step(step)
+        # выводим заголовок и список вариантов одной записью в stdout
+        click.echo("\n".join([
+            self.style(f"{text}:\n", fg="white", bold=True),
+            *(self.style(text=f"{i}. {conn}", fg="cyan", italic=True) for i, conn in enumerate(items, start=1)),
+            ""
+        ]))
         if not many:
             conn_type = self._one_variant(items)
         else:
@@ -90,7 +206,7 @@ class ProjectCli:
         while True:
             try:
                 choice: int = click.prompt(
-                    text=self.style("Введите номер варианта. По умолчанию", fg="green", bold=True),
+                    text=self._prompt_one,
                     type=int,
                     default=1,
                     show_default=True
@@ -106,37 +222,32 @@ class ProjectCli:
                 click.secho("❌ Введите число!", fg="red")
 
     def _many_variants(self, items):
-        variants = []
         while True:
             try:
-                choice: Union[str, int] = click.prompt(
-                    text=self.style("Введите номер варианта (можно несколько через пробел). По умолчанию", fg="green", bold=True),
+                choice: str = click.prompt(
+                    text=self._prompt_many,
                     type=str,
                     default=1,
                     show_default=True
                 )
-                if choice == "None":
-                    return variants
-
-                if isinstance(choice, int):
-                    if 1 <= choice <= len(items):
-                        conn_type: int = items[choice - 1]  # type: ignore
-                        return [items[conn_type]]
-
-                parts = choice.split()
-
-                if parts:
-                    parts = list(map(int, parts))
-                    for p in parts:
-                        if 1 <= p <= len(items) and p not in variants:
-                            variants.append(items[p - 1])
-                    return variants
-                else:
-                    click.secho("❌ Некорректный выбор! Введите число из списка.", fg="red")
             except click.Abort:
                 raise click.ClickException("Операция прервана пользователем.")
-            except Exception:
+
+            if choice == "None":
+                return []
+
+            parts = choice.split()
+            if not parts:
+                click.secho("❌ Некорректный выбор! Введите число из списка.", fg="red")
+                continue
+
+            try:
+                # dict.fromkeys — дедупликация с сохранением порядка ввода
+                indexes = dict.fromkeys(int(p) for p in parts)
+            except ValueError:
                 click.secho("❌ Введите число!", fg="red")
+                continue
+            return [items[i - 1] for i in indexes if 1 <= i <= len(items)]
 
     def _bool_question(
             self,
@@ -153,80 +264,31 @@ class ProjectCli:
         )
         return choice
 
-    def _get_type_connection(self):
-        self._get_choice(
-            text="Выберите тип соединения:",
-            items=CONNECTIONS,
-            key="connection_type",
-            step=2
-        )
-
-    def _get_engine_database(self):
-        if self._bool_question(
-            text="Добавить базу данных?",
-            step=3
-        ):
-            self._get_choice(
-                text="Выберите тип базы данных",
-                items=DATABASES,
-                key="type_database"
-            )
+    def _ask(self, field: PromptField):
+        if field.kind == "token":
+            self._get_token(step=field.step)
+        elif field.kind == "bool":
+            self._data[field.key] = self._bool_question(text=field.text, step=field.step, default=field.default)
+        elif field.confirm and not self._bool_question(text=field.confirm, step=field.step, default=field.default):
+            self._data[field.key] = [] if field.kind == "multichoice" else None
         else:
-            self._data["TYPE_DATABASE"] = None
-
-    def _get_payments(self):
-        if self._bool_question(
-                text=f"Добавить платежные системы? Доступные платежные системы: {PAYMENTS}",
-                step=4,
-                default=False
-        ):
             self._get_choice(
-                text="Выберите типы платежных систем",
-                items=PAYMENTS,
-                key="payments",
-                many=True
+                text=field.text,
+                items=field.items,
+                key=field.key,
+                step=None if field.confirm else field.step,
+                many=field.kind == "multichoice"
             )
-        else:
-            self._data["PAYMENTS"] = []
-
-    def _get_docker_file(self):
-        if self._bool_question(
-                text="Добавить DockerFile?",
-                step=5,
-                default=False
-        ):
-            self._data["DOCKER_FILE"] = True
-        else:
-            self._data["DOCKER_FILE"] = False
-
-    def _get_docker_compose(self):
-        if self._bool_question(
-                text="Добавить docker-compose.yaml?",
-                step=6,
-                default=False
-        ):
-            self._data["DOCKER_COMPOSE"] = True
-        else:
-            self._data["DOCKER_COMPOSE"] = False
-
-    def _get_github_actions(self):
-        if self._bool_question(
-                text="Добавить папку .github для CI/CD?",
-                step=7,
-                default=False
-        ):
-            self._data["GITHUB"] = True
-        else:
-            self._data["GITHUB"] = False
 
     def build_project(self) -> None:
-        self._get_token()
-        self._get_type_connection()
-        self._get_engine_database()
-        self._get_payments()
-        self._get_docker_file()
-        self._get_docker_compose()
-        self._get_github_actions()
+        try:
+            for field in PROJECT_SCHEMA:
+                self._ask(field)
+        finally:
+            if self._runner is not None:
+                # Runner.close() корректно завершает задачи, async-генераторы и executor
+                self._runner.close()
+                self._runner = None
         self._is_build = True
         self._model = ModelProject(**self._data)
 
@@ -4,7 +4,7 @@ from typing import Dict, Any
 
 from botango.core.project_cli import ProjectCli
 from botango.utils.file_systems import HandlerFileSystem
-from botango.utils.template_creator import BotangoTemplate
+from botango.utils.template_creator import BotangoTemplate, render_templates
 
 DATABASE_ROWS = {
     "aiosqlite": {
@@ -33,23 +33,42 @@ PAYMENTS_ROWS = {
     }
 }
 
-SECRET = str(uuid.uuid4())
 
-WEBHOOK_ROWS = {
-    "BASE_URL": "Ваш url. Обязательно должен начинаться с https://",
-    "WEBHOOK_SECRET": SECRET,
-    "WEBHOOK_PATH": "/webhook"
-}
+def _webhook_rows() -> Dict[str, Any]:
+    # секрет генерируем только если он действительно нужен (webhook/ngrok)
+    return {
+        "BASE_URL": "Ваш url. Обязательно должен начинаться с https://",
+        "WEBHOOK_SECRET": str(uuid.uuid4()),
+        "WEBHOOK_PATH": "/webhook"
+    }
 
-NGROK_ROWS = {
-    "WEBHOOK_SECRET": SECRET,
-    "WEBHOOK_PATH": "/telegram/webhook",
-    "NGROK_TOKEN": "Это обязательный параметр для первого запуска! Прочтите как правильно пользоваться Ngrok. Не использовать в production!"
+
+def _ngrok_rows() -> Dict[str, Any]:
+    return {
+        "WEBHOOK_SECRET": str(uuid.uuid4()),
+        "WEBHOOK_PATH": "/telegram/webhook",
+        "NGROK_TOKEN": "Это обязательный параметр для первого запуска! Прочтите как правильно пользоваться Ngrok. Не использовать в production!"
+    }
+
+
+# type(v) -> аннотация в settings.py; bool проверяется отдельно от int
+TYPE_LABELS = {
+    bool: "bool",
+    int: "int",
+    float: "float",
+    str: "str",
+    list: "list",
+    tuple: "tuple",
+    set: "set",
+    dict: "dict"
 }
 
 
 class FileCreator:
     exclude_keys = ["DOCKER_FILE", "DOCKER_COMPOSE", "GITHUB"]
+    # ключи проекта, которые не попадают в .env как есть
+    drop_keys = frozenset({"TYPE_DATABASE", "PAYMENTS", *exclude_keys})
+
     def __init__(self):
         self.project_cli = ProjectCli()
         self.env_dict: Dict[str, Any] = {}
@@ -61,55 +80,30 @@ class FileCreator:
         self.project_cli.model.install_packages(dry_run=False)
 
     def _env_dict(self):
-        self.env_dict = self.project_cli.data.copy()
-        database = self.env_dict.pop("TYPE_DATABASE")
+        src = self.project_cli.data
+        drop = self.drop_keys
+        self.env_dict = {k: v for k, v in src.items() if k not in drop}
+        database = src.get("TYPE_DATABASE")
         if database:
-            self.env_dict.update(DATABASE_ROWS.get(database))
-        payments = self.env_dict.pop("PAYMENTS")
-        if payments:
-            for p in payments:
-                self.env_dict.update(PAYMENTS_ROWS.get(p))
-        for value in self.exclude_keys:
-            self.env_dict.pop(value)
-        conn_type = self.env_dict.get("CONNECTION_TYPE")
+            self.env_dict.update(DATABASE_ROWS[database])
+        for p in src.get("PAYMENTS") or ():
+            self.env_dict.update(PAYMENTS_ROWS[p])
+        conn_type = src.get("CONNECTION_TYPE")
         if conn_type == "webhook":
-            self.env_dict.update(WEBHOOK_ROWS)
+            self.env_dict.update(_webhook_rows())
         elif conn_type == "ngrok":
-            self.env_dict.update(NGROK_ROWS)
+            self.env_dict.update(_ngrok_rows())
         return self.env_dict
 
     @staticmethod
     def _create_env_file(env_data: Dict[str, Any]):
         env_path = Path("data/.env")
         env_path.parent.mkdir(parents=True, exist_ok=True)
-        str_list = [f"{k}={v}" for k, v in env_data.items()]
-        with env_path.open(mode="w", encoding="utf-8") as file:
-            file.write("\n".join(str_list))
+        env_path.write_text("\n".join(f"{k}={v}" for k, v in env_data.items()), encoding="utf-8")
 
     @staticmethod
-    def _get_type_var(var: Any) -> str:
-        if isinstance(var, int):
-            return "int"
-        elif isinstance(var, float):
-            return "float"
-        elif isinstance(var, bool):
-            return "bool"
-        elif isinstance(var, list):
-            return "list"
-        elif isinstance(var, dict):
-            return "dict"
-        elif isinstance(var, set):
-            return "set"
-        elif isinstance(var, tuple):
-            return "tuple"
-        else:
-            return "str"
-
-    def _settings_adapter(self, env_data: Dict[str, Any]) -> Dict[str, Any]:
-        settings_data = {}
-        for k, v in env_data.items():
-            settings_data[k] = self._get_type_var(v)
-        return settings_data
+    def _settings_adapter(env_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: TYPE_LABELS.get(type(v), "str") for k, v in env_data.items()}
 
     def create(self):
         self._build_project()
@@ -127,8 +121,7 @@ class FileCreator:
             template_name="main.j2",
             data={"settings_data": self.env_dict}
         )
-        settings_template.render()
-        main_template.render()
+        render_templates([settings_template, main_template])
         HandlerFileSystem(self.env_dict).create()
 
 
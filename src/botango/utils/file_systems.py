@@ -1,7 +1,7 @@
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-from botango.utils.template_creator import BotangoTemplate
+from botango.utils.template_creator import BotangoTemplate, render_templates
 
 
 class BaseFileSystem:
@@ -20,20 +20,18 @@ class HandlerFileSystem(BaseFileSystem):
     base_directory = Path("bot/handlers")
 
     def create(self):
+        init_path = self.base_directory / "__init__.py"
+        example_path = self.base_directory / "example_handler.py"
         files = [
             BotangoTemplate(
-                filename=self.base_directory / "__init__.py",
+                filename=init_path,
                 template_name="default_init.j2",
-                data={
-                    "path": self.base_directory / "__init__.py",
-                    "imports": ["from .example_handler import example_router"]
-                }
+                data={"imports": ["from .example_handler import example_router"]}
             ),
             BotangoTemplate(
-                filename=self.base_directory / "example_handler.py",
-                template_name="example_handler.j2",
-                data={"path": self.base_directory / "example_handler.py"}
+                filename=example_path,
+                template_name="example_handler.j2"
             )
         ]
-        [f.render() for f in files]
+        render_templates(files)
 
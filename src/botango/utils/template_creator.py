@@ -1,34 +1,121 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Union, Dict, Any
+from typing import Union, Dict, Any, Sequence, TYPE_CHECKING
 
-from jinja2 import Environment, FileSystemLoader
-from pydantic import BaseModel, Field, ConfigDict
+from botango import __version__
+
+if TYPE_CHECKING:
+    from jinja2 import Environment, Template
 
 TEMPLATE_DIR = Path(__file__).parent.parent / "templates"
+# Версия в пути — после обновления botango старый байткод шаблонов не подхватится
+BYTECODE_CACHE_DIR = Path.home() / ".cache" / "botango" / "jinja" / __version__
 
-class BotangoTemplate(BaseModel):
-    filename: Union[str, Path]
-    template_name: Union[str, Path]
-    data: Dict[str, Any] = Field(default_factory=dict)
-    environment: Environment = Environment(
+
+@lru_cache(maxsize=1)
+def get_environment() -> "Environment":
+    """
+    Один Environment на процесс: шаблоны пакета не меняются во время работы CLI,
+    поэтому auto_reload не нужен, а скомпилированные шаблоны переиспользуются.
+    jinja2 и каталог кэша байткода подключаются только при первом рендере.
+    """
+    from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+
+    class _SafeBytecodeCache(FileSystemBytecodeCache):
+        # Кэш байткода — лишь оптимизация: ошибки диска (read-only ~/.cache, нет места)
+        # не должны прерывать генерацию, шаблон просто компилируется заново.
+        def load_bytecode(self, bucket):
+            try:
+                super().load_bytecode(bucket)
+            except OSError:
+                pass
+
+        def dump_bytecode(self, bucket):
+            try:
+                super().dump_bytecode(bucket)
+            except OSError:
+                pass
+
+    try:
+        BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        bytecode_cache = _SafeBytecodeCache(directory=str(BYTECODE_CACHE_DIR), pattern="%s.cache")
+    except OSError:
+        bytecode_cache = None
+    return Environment(
         loader=FileSystemLoader(searchpath=TEMPLATE_DIR, encoding="utf-8"),
         trim_blocks=True,
-        lstrip_blocks=True
+        lstrip_blocks=True,
+        auto_reload=False,
+        bytecode_cache=bytecode_cache
     )
 
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+@lru_cache(maxsize=None)
+def get_template(name: str) -> "Template":
+    return get_environment().get_template(name)
+
+
+def _read_existing(file_path: Path) -> str | None:
+    try:
+        return file_path.read_text(encoding="utf-8")
+    except UnicodeDecodeError:
+        # файл в другой кодировке (например, cp1251) — считаем изменённым и перезаписываем
+        return None
+
+
+def write_file(file_path: Path, content: str) -> None:
+    """Записывает файл; родительский каталог должен уже существовать."""
+    # повторный init не должен перезаписывать (и трогать mtime) неизменившиеся файлы
+    if file_path.is_file() and _read_existing(file_path) == content:
+        return
+    file_path.write_text(content, encoding="utf-8")
+
+
+@dataclass(slots=True)
+class BotangoTemplate:
+    filename: Union[str, Path]
+    template_name: Union[str, Path]
+    data: Dict[str, Any] = field(default_factory=dict)
+    _template: "Template" = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # шаблон резолвим при создании — отсутствующий .j2 виден сразу, а render() только рендерит
+        self._template = get_template(str(self.template_name))
 
     def _read_template(self) -> str:
-        temp = self.environment.get_template(str(self.template_name))
-        return temp.render(**self.data)
+        # путь к создаваемому файлу доступен в шаблоне как {{ path }}
+        return self._template.render({"path": self.filename, **self.data})
+
+    @property
+    def file_path(self) -> Path:
+        return self.filename if isinstance(self.filename, Path) else Path(self.filename)
 
     def render(self):
-        file_path = self.filename if isinstance(self.filename, Path) else Path(self.filename)
+        file_path = self.file_path
         file_path.parent.mkdir(parents=True, exist_ok=True)
-        with file_path.open("w", encoding="utf-8") as file:
-            file.write(self._read_template())
+        write_file(file_path, self._read_template())
+
 
+def render_templates(templates: Sequence[BotangoTemplate]) -> None:
+    """
+    Рендерит шаблоны последовательно (jinja — CPU, GIL), а независимые записи
+    файлов выполняет в пуле потоков. BOTANGO_NO_PARALLEL=1 отключает пул.
+    """
+    rendered = [(t.file_path, t._read_template()) for t in templates]
+    # каждый каталог создаём один раз за вызов и до записи, чтобы потоки его не проверяли
+    for directory in {file_path.parent for file_path, _ in rendered}:
+        directory.mkdir(parents=True, exist_ok=True)
+    if len(rendered) < 2 or os.environ.get("BOTANGO_NO_PARALLEL") == "1":
+        for file_path, content in rendered:
+            write_file(file_path, content)
+        return
+    with ThreadPoolExecutor(max_workers=min(8, len(rendered))) as executor:
+        # list() — чтобы исключения из потоков пробросились сюда
+        list(executor.map(lambda item: write_file(*item), rendered))
 
 
 if __name__ == '__main__':
-    print(TEMPLATE_DIR)
\ No newline at end of file
+    print(TEMPLATE_DIR)